@@ -1,13 +1,29 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import os
+import io
+import re
 import html
 import time
+import itertools
+import hashlib
+import threading
 import requests
 import json
-import xml.etree.ElementTree as ET
+import orjson
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    from lxml import etree
+except ImportError:  # 環境沒裝 lxml 時退回 stdlib (一樣走 C 加速的 iterparse)
+    etree = None
+    import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta, timezone
-from google import genai
+try:
+    from google import genai
+except ImportError:  # 沒裝 google-genai 只會少摘要，不該連新聞都抓不了
+    genai = None
 
 # 🔑 讀取 GitHub Secrets 金鑰 (Success Mode)
 LINE_CHANNEL_ACCESS_TOKEN = os.environ.get("LINE_CHANNEL_ACCESS_TOKEN")
@@ -19,57 +35,194 @@ TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 
 RSS_URL = 'https://news.google.com/rss?hl=zh-TW&gl=TW&ceid=TW:zh-Hant'
+RSS_CACHE_FILE = '.rss_cache.json'  # 存 ETag / Last-Modified，下次拿 304 省流量
+PUSH_HASH_FILE = '.last_push_hash'  # 上次推播內容的雜湊，內容沒變就不再吵使用者
+
+TW_TZ = timezone(timedelta(hours=8))  # 🇹🇼 台灣時區，建一次全場共用
+
+# 🌐 共用連線池：RSS / LINE / Telegram 都走同一個 Session，免去每次 TLS 握手
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                      max_retries=Retry(total=2, backoff_factor=0.3)))
+SESSION.headers.update({'User-Agent': 'news-pwa/1.0', 'Accept-Encoding': 'gzip, br'})
+
+# 🤖 Gemini Client 建一次全場共用，三個模型的備援共用同一條連線與認證
+try:
+    GENAI_CLIENT = genai.Client(api_key=GEMINI_API_KEY) if (genai and GEMINI_API_KEY) else None
+except Exception as e:
+    print(f"⚠️ Gemini Client 初始化失敗: {e}")
+    GENAI_CLIENT = None
+
+# ⚡ RSS 快速通道：只要 <item> 裡的 title/link，regex 直取可跳過整套 XML 機器
+ITEM_RE = re.compile(
+    rb'<item>.*?<title>(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?</title>'
+    rb'.*?<link>(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?</link>.*?</item>',
+    re.DOTALL)
+
+def _fast_rss_items(content):
+    """regex 直取前 10 則；湊不滿 10 則表示 feed 格式變了，回 None 退回 XML 解析"""
+    # finditer + islice 懶惰掃描：第 10 則到手就停，不把整個 buffer 掃完
+    matches = list(itertools.islice(ITEM_RE.finditer(content), 10))
+    if len(matches) < 10:
+        return None
+    return [(html.unescape(m[1].decode('utf-8', 'replace')),
+             html.unescape(m[2].decode('utf-8', 'replace'))) for m in matches]
+
+def _iter_rss_items(content):
+    """逐則吐出 (title, link)，邊解析邊釋放節點，不把整份 feed 留在記憶體"""
+    if etree is not None:
+        for _, item in etree.iterparse(io.BytesIO(content), tag='item', events=('end',)):
+            # findtext 一次到位，缺欄位時回空字串而不是炸 AttributeError
+            yield item.findtext('title') or '', item.findtext('link') or ''
+            item.clear()
+            while item.getprevious() is not None:
+                del item.getparent()[0]
+    else:
+        for _, el in ET.iterparse(io.BytesIO(content), events=('end',)):
+            if el.tag == 'item':
+                yield el.findtext('title') or '', el.findtext('link') or ''
+                el.clear()
 
 def fetch_google_news():
-    """抓取新聞並過濾長網址"""
+    """抓取新聞並過濾長網址 (串流解析，只要前 10 則不必建整棵樹)"""
     try:
-        response = requests.get(RSS_URL, timeout=10)
+        # 條件式 GET：feed 沒變就收 304，連解析都省了
+        headers = {}
+        try:
+            with open(RSS_CACHE_FILE, encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('etag'): headers['If-None-Match'] = cache['etag']
+            if cache.get('last_modified'): headers['If-Modified-Since'] = cache['last_modified']
+        except Exception: pass
+
+        response = SESSION.get(RSS_URL, headers=headers, stream=True, timeout=10)
+        if response.status_code == 304:
+            print("📦 RSS 未變動 (304)，沿用上次的 latest_news.json")
+            with open('latest_news.json', encoding='utf-8') as f:
+                return json.load(f).get('news', [])
         response.raise_for_status()
-        root = ET.fromstring(response.content)
+        # 分塊下載：湊滿 10 則就停收，feed 後面 ~90% 連下載都省了
+        # (2MB 上限保底，feed 異常暴肥也吃不爆 runner 記憶體)
+        body = b''
+        items = None
+        for chunk in response.iter_content(chunk_size=65536):
+            body += chunk
+            items = _fast_rss_items(body)
+            if items is not None or len(body) > 2_000_000: break
         news_list = []
-        for item in root.findall('./channel/item')[:10]:
-            title = item.find('title').text
-            link = item.find('link').text
-            clean_title = title.split(' - ')[0]
+        link_overflow = 0  # 統計超長網址出現頻率，評估要不要上短網址服務
+        # regex 快速通道湊不滿 10 則 (格式變了/短 feed) 才退回 XML 解析
+        if items is None:
+            items = _iter_rss_items(body)
+        # 逐則消化 <item>，抓滿 10 則就提前收工
+        for title, link in items:
+            # partition 在第一個 ' - ' 就停手，不像 split 把整串都切一輪
+            clean_title = title.partition(' - ')[0]
             # URL 安全閥：防止網址過長導致 LINE 報錯
-            if len(link) > 990: link = "https://news.google.com/"
+            # (截斷的 Google News 網址會 404，只能退回首頁連結)
+            if len(link) > 990:
+                link_overflow += 1
+                link = "https://news.google.com/"
             news_list.append({'title': clean_title, 'link': link})
+            if len(news_list) >= 10: break
+        if link_overflow:
+            print(f"⚠️ link_overflow: {link_overflow} 則網址超過 990 字，已退回首頁連結")
+        # 記下驗證標頭，下一輪才有 304 可拿
+        try:
+            with open(RSS_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({'etag': response.headers.get('ETag'),
+                           'last_modified': response.headers.get('Last-Modified')}, f)
+        except Exception: pass
         return news_list
     except Exception as e:
         print(f"Fetch Error: {e}"); return []
 
-def get_gemini_summary(news_list):
-    """AI 摘要生成 (旗艦成功版 + 分類提示詞)"""
-    if not GEMINI_API_KEY: return "❌ 缺少 API Key"
-    
-    titles_text = "\n".join([f"- {n['title']}" for n in news_list])
-    
-    # 強制台灣時間
+# 🕒 問候語查表 (配合主播口吻)：用 now.hour 直接索引，免走條件分支
+GREETINGS = (("晚安", "今日晚間"),) * 5 + (("早安", "今日上午"),) * 7 \
+          + (("午安", "今日午間"),) * 6 + (("晚安", "今日晚間"),) * 6
+
+# 📝 主播提示詞模板 (分類提示詞版)：固定文案建一次，每次只填標題與開場白
+PROMPT_TMPL = (
+    "以下是台灣今日熱門新聞標題：\n{titles}\n\n"
+    "請扮演專業主播，以『{opening}』作為開場白，"
+    "為我生成一份「分段式」的重點快報，總字數約 250-300 字。"
+    "⚠️ 分類建議：請根據新聞內容自然分類（如【政治焦點】、【國際情勢】、【財經動態】、【社會民生】等）。"
+    "⚠️ 格式要求：\n"
+    "1. 每個【分類標題】獨佔一行。\n"
+    "2. 分類與內容之間請換行，不同分類之間請空一行。\n"
+    "3. 語氣簡潔有力，嚴禁使用 Markdown 星號 (**) 或粗體語法。"
+)
+
+PROMPT_TITLE_MAX = 60  # 字：再長的標題對摘要也沒幫助，只是多燒輸入 token
+
+SUMMARY_CACHE_DIR = '.summary_cache'
+SUMMARY_CACHE_TTL = 30 * 60  # 秒：cron 跑得比新聞輪替勤，同標題 30 分內直接吃快取
+SUMMARY_MATCH_RATIO = 0.8    # 標題八成重疊就當同一批新聞，輪替一兩則不值得重生摘要
+
+def _save_summary_cache(cache_path, summary, titles):
+    """摘要連同標題寫入快取，失敗就算了 (快取只是加分項)；順手清掉過期項目"""
     try:
-        tw_time = datetime.now(timezone(timedelta(hours=8)))
-        h = tw_time.hour
-    except: h = datetime.now().hour
-
-    # 🕒 優化問候語邏輯 (配合主播口吻)
-    if 5 <= h < 12: greeting, period = "早安", "今日上午"
-    elif 12 <= h < 18: greeting, period = "午安", "今日午間"
-    else: greeting, period = "晚安", "今日晚間"
-    
-    opening = f"{greeting}，為您帶來{period}重點快報"
+        os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'ts': time.time(), 'summary': summary, 'titles': titles},
+                      f, ensure_ascii=False)
+        # 快取目錄會跨次保存，過期 (或壞掉) 的項目不清會越積越多
+        now_ts = time.time()
+        for name in os.listdir(SUMMARY_CACHE_DIR):
+            path = os.path.join(SUMMARY_CACHE_DIR, name)
+            if path == cache_path: continue
+            try:
+                with open(path, encoding='utf-8') as f:
+                    expired = now_ts - json.load(f)['ts'] >= SUMMARY_CACHE_TTL
+            except Exception:
+                expired = True
+            if expired:
+                try: os.remove(path)
+                except Exception: pass
+    except Exception: pass
 
-    # 📝 核心修改：植入你指定的分類提示詞
-    prompt = (
-        f"以下是台灣今日熱門新聞標題：\n{titles_text}\n\n"
-        f"請扮演專業主播，以『{opening}』作為開場白，"
-        "為我生成一份「分段式」的重點快報，總字數約 250-300 字。"
-        "⚠️ 分類建議：請根據新聞內容自然分類（如【政治焦點】、【國際情勢】、【財經動態】、【社會民生】等）。"
-        "⚠️ 格式要求：\n"
-        "1. 每個【分類標題】獨佔一行。\n"
-        "2. 分類與內容之間請換行，不同分類之間請空一行。\n"
-        "3. 語氣簡潔有力，嚴禁使用 Markdown 星號 (**) 或粗體語法。"
-    )
+def _load_cached_summary(cache_path, titles):
+    """先比完全相同的 key，再掃近期快取找標題重疊 >= 8 成的近似命中"""
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cached = json.load(f)
+        if time.time() - cached['ts'] < SUMMARY_CACHE_TTL:
+            return cached['summary']
+    except Exception: pass
+    try:
+        title_set = set(titles)
+        if not title_set: return None
+        for name in os.listdir(SUMMARY_CACHE_DIR):
+            with open(os.path.join(SUMMARY_CACHE_DIR, name), encoding='utf-8') as f:
+                cached = json.load(f)
+            if time.time() - cached['ts'] >= SUMMARY_CACHE_TTL: continue
+            overlap = len(title_set & set(cached.get('titles', ())))
+            if overlap / len(title_set) >= SUMMARY_MATCH_RATIO:
+                return cached['summary']
+    except Exception: pass
+    return None
+
+def get_gemini_summary(news_list, now=None):
+    """AI 摘要生成 (旗艦成功版 + 分類提示詞)"""
+    if GENAI_CLIENT is None: return "❌ 缺少 API Key"
+
+    # 同一組 (或幾乎同一組) 標題短時間內不重打 Gemini：標題排序後取 SHA-1 當 key
+    titles = sorted(n['title'] for n in news_list)
+    cache_key = hashlib.sha1('\n'.join(titles).encode()).hexdigest()
+    cache_path = os.path.join(SUMMARY_CACHE_DIR, f"{cache_key}.json")
+    cached_summary = _load_cached_summary(cache_path, titles)
+    if cached_summary is not None:
+        print("📦 標題沒 (怎麼) 變，沿用快取摘要 (跳過 Gemini)")
+        return cached_summary
 
-    client = genai.Client(api_key=GEMINI_API_KEY)
+    # genexpr 直接餵給 join，省掉中間那個 list；標題截到 60 字控輸入 token
+    # (只影響提示詞，LINE / Telegram / PWA 顯示的還是完整標題)
+    titles_text = "\n".join(f"- {n['title'][:PROMPT_TITLE_MAX]}" for n in news_list)
+
+    # 強制台灣時間 (沒傳 now 就自己取一次)；問候語直接查表
+    greeting, period = GREETINGS[(now or datetime.now(TW_TZ)).hour]
+    opening = f"{greeting}，為您帶來{period}重點快報"
+    prompt = PROMPT_TMPL.format(titles=titles_text, opening=opening)
 
     # 🎯 黃金備援清單（2026-06 更新：2.0 系列免費額度已被歸零，改用 2.5 系列）
     models_to_try = [
@@ -82,16 +235,23 @@ def get_gemini_summary(news_list):
     TRANSIENT = ("503", "UNAVAILABLE", "429", "RESOURCE_EXHAUSTED", "overloaded")
     MAX_RETRY = 3  # 每個模型最多重試次數
 
-    for model_name in models_to_try:
+    # 🏁 三個模型同時起跑，誰先回來用誰；winner 旗標讓輸家別再傻等重試
+    winner = threading.Event()
+
+    def _call_model(model_name):
         for attempt in range(1, MAX_RETRY + 1):
+            if winner.is_set():
+                raise RuntimeError("已有其他模型完成")
             try:
                 print(f"🤖 嘗試使用模型: {model_name} (第 {attempt} 次) ...")
-                response = client.models.generate_content(
+                # 串流接收：第一個 chunk 壞掉馬上換援，不用等整包超時
+                buf = []
+                for chunk in GENAI_CLIENT.models.generate_content_stream(
                     model=model_name,
                     contents=prompt
-                )
-                print(f"✅ 成功！由 [{model_name}] 完成摘要。")
-                return response.text.replace("**", "")  # 二次保險淨化 Markdown
+                ):
+                    if chunk.text: buf.append(chunk.text)
+                return model_name, ''.join(buf)
             except Exception as e:
                 msg = str(e)
                 is_transient = any(k in msg for k in TRANSIENT)
@@ -99,56 +259,93 @@ def get_gemini_summary(news_list):
                 if is_transient and attempt < MAX_RETRY:
                     wait = 10 * attempt
                     print(f"⏳ {model_name} 暫時忙碌，{wait} 秒後重試...")
-                    time.sleep(wait)
+                    if winner.wait(wait): raise RuntimeError("已有其他模型完成")
                     continue
-                # 非暫時性錯誤，或重試用盡 -> 換下一個模型
-                print(f"⚠️ {model_name} 無法使用 ({msg[:120]})，切換備援...")
-                break
+                print(f"⚠️ {model_name} 無法使用 ({msg[:120]})")
+                raise
+
+    HEDGE_DELAY = 8  # 秒：讓主力先跑一拍，沒回來才放備援出門 (hedged request)
+
+    pool = ThreadPoolExecutor(max_workers=len(models_to_try))
+    try:
+        # 錯開出發而不是三發齊射：主力夠快就不浪費備援模型的免費額度，
+        # 主力卡住時尾延遲也被壓在 HEDGE_DELAY + 最快模型的回應時間
+        remaining = list(models_to_try)
+        pending = set()
+        while remaining or pending:
+            if remaining:
+                pending.add(pool.submit(_call_model, remaining.pop(0)))
+            done, pending = wait(pending, timeout=HEDGE_DELAY if remaining else None,
+                                 return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    model_name, text = fut.result()
+                except Exception:
+                    continue
+                winner.set()
+                print(f"✅ 成功！由 [{model_name}] 完成摘要。")
+                summary = text.replace("**", "")  # 二次保險淨化 Markdown
+                _save_summary_cache(cache_path, summary, titles)
+                return summary
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
     return "❌ AI 暫時無法回應 (所有模型皆忙碌)"
 
-def send_flex_message(news_list, summary):
-    """發送滿版舒服版訊息 (Giga Size)"""
+# 🧱 Flex 靜態模板：排版常數建一次就好，每次發送只覆寫動態欄位
+_SUMMARY_BOX = {"type": "box", "layout": "vertical", "backgroundColor": "#f0f8ff", "cornerRadius": "md", "paddingAll": "md", "margin": "md"}
+_SUMMARY_TITLE = {"type": "text", "text": "🤖 AI 重點摘要", "weight": "bold", "size": "md", "color": "#1DB446"}
+_HOT_HEADER = {"type": "text", "text": "🔥 熱門頭條", "weight": "bold", "size": "xl"}
+_HEADLINE_TEMPLATE = {"type": "box", "layout": "horizontal", "margin": "lg"}
+_IDX_TEMPLATE = {"type": "text", "flex": 0, "color": "#aaaaaa", "size": "lg"}
+_TITLE_TEMPLATE = {"type": "text", "wrap": True, "size": "lg", "color": "#111111", "flex": 1, "margin": "md"}
+
+HEADLINES_PER_BUBBLE = 5  # 頭條每 5 則一顆泡泡，客戶端先畫前面的不用等整包
+
+def send_flex_message(news_list, summary, now=None):
+    """發送滿版舒服版訊息 (Giga Size，多泡泡一次 push)"""
     if not LINE_CHANNEL_ACCESS_TOKEN: return
     url = "https://api.line.me/v2/bot/message/push"
     headers = {"Content-Type": "application/json", "Authorization": f"Bearer {LINE_CHANNEL_ACCESS_TOKEN}"}
-    tw_time = datetime.now(timezone(timedelta(hours=8))).strftime("%Y-%m-%d %H:%M")
+    tw_time = (now or datetime.now(TW_TZ)).strftime("%Y-%m-%d %H:%M")
 
-    flex = [{"type": "text", "text": f"📅 {tw_time} 新聞快報", "weight": "bold", "size": "md", "color": "#888888"}]
-    
+    def _bubble(alt, contents):
+        # ✨ 關鍵：Giga 尺寸確保手機滿版閱讀舒服
+        return {"type": "flex", "altText": alt,
+                "contents": {"type": "bubble", "size": "giga",
+                             "body": {"type": "box", "layout": "vertical", "contents": contents}}}
+
+    head = [{"type": "text", "text": f"📅 {tw_time} 新聞快報", "weight": "bold", "size": "md", "color": "#888888"}]
     if summary:
-        flex.append({
-            "type": "box", "layout": "vertical", "backgroundColor": "#f0f8ff", "cornerRadius": "md", "paddingAll": "md", "margin": "md",
-            "contents": [
-                {"type": "text", "text": "🤖 AI 重點摘要", "weight": "bold", "size": "md", "color": "#1DB446"},
-                {"type": "text", "text": summary, "wrap": True, "size": "md", "margin": "md", "color": "#555555", "lineSpacing": "6px"}
-            ]
-        })
-        
-    flex.append({"type": "separator", "margin": "xl"})
-    flex.append({"type": "text", "text": "🔥 熱門頭條", "weight": "bold", "size": "xl", "margin": "xl"})
+        head.append(dict(_SUMMARY_BOX, contents=[
+            _SUMMARY_TITLE,
+            {"type": "text", "text": summary, "wrap": True, "size": "md", "margin": "md", "color": "#555555", "lineSpacing": "6px"}
+        ]))
+    messages = [_bubble(f"🔔 {tw_time} 新聞", head)]
 
-    for i, item in enumerate(news_list, 1):
-        flex.append({
-            "type": "box", "layout": "horizontal", "margin": "lg",
-            "contents": [
-                {"type": "text", "text": f"{i}.", "flex": 0, "color": "#aaaaaa", "size": "lg"},
-                {"type": "text", "text": item['title'], "wrap": True, "size": "lg", "color": "#111111", "flex": 1, "margin": "md", "action": {"type": "uri", "uri": item['link']}}
-            ]
-        })
-        
-    # ✨ 關鍵：Giga 尺寸確保手機滿版閱讀舒服
-    payload = {"to": LINE_USER_ID, "messages": [{"type": "flex", "altText": f"🔔 {tw_time} 新聞", "contents": {"type": "bubble", "size": "giga", "body": {"type": "box", "layout": "vertical", "contents": flex}}}]}
-    requests.post(url, headers=headers, data=json.dumps(payload))
-
-def send_telegram_message(news_list, summary):
+    # 拆小顆的 Flex 樹渲染得快，也離單顆泡泡的大小上限遠一點
+    for start in range(0, len(news_list), HEADLINES_PER_BUBBLE):
+        rows = [_HOT_HEADER if start == 0 else dict(_HOT_HEADER, text="🔥 熱門頭條 (續)")]
+        for i, item in enumerate(news_list[start:start + HEADLINES_PER_BUBBLE], start + 1):
+            rows.append(dict(_HEADLINE_TEMPLATE, contents=[
+                dict(_IDX_TEMPLATE, text=f"{i}."),
+                dict(_TITLE_TEMPLATE, text=item['title'], action={"type": "uri", "uri": item['link']})
+            ]))
+        messages.append(_bubble("🔥 熱門頭條", rows))
+
+    # LINE push 單次最多 5 則訊息，一通 HTTPS 送完整批
+    # (orjson 直接給 bytes，跳過 json.dumps 的中間字串再編碼一次)
+    payload = {"to": LINE_USER_ID, "messages": messages[:5]}
+    SESSION.post(url, headers=headers, data=orjson.dumps(payload))
+
+def send_telegram_message(news_list, summary, now=None):
     """🆕 發送 Telegram 訊息 (HTML 格式)。沒設金鑰就直接跳過，不影響 LINE。"""
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         print(" ⏭️  未設定 Telegram 金鑰，跳過 Telegram 發送。")
         return
 
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    tw_time = datetime.now(timezone(timedelta(hours=8))).strftime("%Y-%m-%d %H:%M")
+    tw_time = (now or datetime.now(TW_TZ)).strftime("%Y-%m-%d %H:%M")
 
     # 把標題轉成 HTML 超連結；標題與摘要都做 HTML 跳脫，避免特殊字元破壞版面
     news_content = ""
@@ -178,7 +375,7 @@ def send_telegram_message(news_list, summary):
             "disable_web_page_preview": True,
         }
         try:
-            response = requests.post(url, json=payload, timeout=15)
+            response = SESSION.post(url, json=payload, timeout=15)
             if response.status_code == 200 and response.json().get("ok"):
                 print(f" ✅  Telegram 發送成功！(chat_id={chat_id})")
             else:
@@ -186,19 +383,57 @@ def send_telegram_message(news_list, summary):
         except Exception as e:
             print(f" ❌  Telegram 連線錯誤 (chat_id={chat_id}): {e}")
 
-def update_pwa_data(news_list, summary):
+def update_pwa_data(news_list, summary, now=None):
     """同步更新 PWA 資料"""
     try:
-        tw_time = datetime.now(timezone(timedelta(hours=8))).strftime("%Y-%m-%d %H:%M")
+        tw_time = (now or datetime.now(TW_TZ)).strftime("%Y-%m-%d %H:%M")
         data = {"updated_at": tw_time, "summary": summary, "news": news_list}
-        with open('latest_news.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        # 新聞跟摘要都沒變就不落盤：只差時間戳不值得觸發一次 commit+push
+        try:
+            with open('latest_news.json', 'rb') as f:
+                old = orjson.loads(f.read())
+            if old.get('summary') == summary and old.get('news') == news_list:
+                print("📦 PWA 資料無變化，跳過寫檔")
+                return
+        except Exception: pass
+        # 先寫暫存檔再原子換名，PWA 永遠只會讀到完整的 JSON
+        # (orjson 直接吐 UTF-8 bytes；不縮排，這檔案只有程式在讀，排版是白花的流量)
+        with open('latest_news.json.tmp', 'wb') as f:
+            f.write(orjson.dumps(data))
+        os.replace('latest_news.json.tmp', 'latest_news.json')
     except: pass
 
+def _warmup_gemini():
+    """提前跟 Gemini 完成 TLS/認證握手，之後第一發 generate_content 不用再等建線"""
+    if GENAI_CLIENT is None: return
+    try:
+        next(iter(GENAI_CLIENT.models.list()), None)
+    except Exception: pass
+
 if __name__ == "__main__":
+    # 抓 RSS 的同時先去和 Gemini 握手，把建線時間藏進網路等待裡
+    warmup_pool = ThreadPoolExecutor(max_workers=1)
+    warmup_pool.submit(_warmup_gemini)
     news = fetch_google_news()
+    warmup_pool.shutdown(wait=False)
     if news:
-        summary = get_gemini_summary(news)
-        send_flex_message(news, summary)
-        send_telegram_message(news, summary)
-        update_pwa_data(news, summary)
+        now = datetime.now(TW_TZ)  # 時間取一次，三個出口共用，不會跨秒飄移
+        summary = get_gemini_summary(news, now=now)
+        # 跟上次推播內容一字不差就跳過發送，省 LINE 額度也省通知轟炸
+        push_hash = hashlib.sha1(json.dumps({'n': news, 's': summary}, sort_keys=True).encode()).hexdigest()
+        try:
+            with open(PUSH_HASH_FILE) as f: last_hash = f.read().strip()
+        except Exception: last_hash = None
+        # LINE / Telegram / 寫檔互不相依，平行跑，等最慢的那個就好
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            tasks = [pool.submit(update_pwa_data, news, summary, now=now)]
+            if push_hash != last_hash:
+                tasks.append(pool.submit(send_flex_message, news, summary, now=now))
+                tasks.append(pool.submit(send_telegram_message, news, summary, now=now))
+            else:
+                print("📦 內容與上次推播相同，跳過 LINE / Telegram 發送")
+            for t in tasks: t.result()
+        if push_hash != last_hash:
+            try:
+                with open(PUSH_HASH_FILE, 'w') as f: f.write(push_hash)
+            except Exception: pass